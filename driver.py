@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 from smbus2 import SMBus, i2c_msg
+from smbus2.smbus2 import I2C_RDWR, I2C_M_RD, i2c_rdwr_ioctl_data
 from evdev import UInput, AbsInfo, ecodes as e
-import time, argparse
+import os, struct, argparse, asyncio, signal, ctypes, fcntl
 
 """
 GT911 programming guide: https://community.nxp.com/pwmxy87654/attachments/pwmxy87654/imx-processors/177678/1/GT911%20Programming%20Guide_v0.1%20(1).pdf
@@ -13,15 +14,30 @@ Known limitations/bugs:
 
     * Polling is kind of slow (especially so with multiple touch points)
     * Vertical screen orientation currently doesn't work with this under Wayland. X11 works with some xrandr hacks
-    * The exit/cleanup function isn't really implemented yet
-        * Eventual TODO: implement CTRL+C / CTRL+D / SIGTERM handlers to actually do that
-        * Eventual-eventual TODO: better systemd integration so it actually works as a proper daemon
+    * Eventual TODO: better systemd integration so it actually works as a proper daemon
 
 """
 
 class GT911:
 
-    def __init__(self, busID = "/dev/i2c-touchscreen", device = 0x5D, scaling = 1, flipX = False, flipY = False, swapXY = False, debug = False):
+    # Number of track IDs (and hence multitouch slots) we keep state for
+    MAX_TRACKS = 10
+
+    # Status byte plus all five 8-byte touch point slots (0x814E - 0x8176)
+    REPORT_LENGTH = 1 + 5 * 8
+
+    # One 8-byte touch point slot: track, x, y, size (all little-endian), reserved
+    TOUCH_POINT = struct.Struct("<BHHHx")
+
+    # struct input_event (timeval, type, code, value) - the kernel timestamps uinput events itself
+    INPUT_EVENT = struct.Struct("llHHi")
+
+    # The fixed event sequences for new/updated/ended tracks, so each one is packed in a single call
+    NEW_TRACK_EVENTS = struct.Struct(INPUT_EVENT.format * 5)
+    UPDATE_TRACK_EVENTS = struct.Struct(INPUT_EVENT.format * 4)
+    END_TRACK_EVENTS = struct.Struct(INPUT_EVENT.format * 2)
+
+    def __init__(self, busID = "/dev/i2c-touchscreen", device = 0x5D, scaling = 1, flipX = False, flipY = False, swapXY = False, intGPIO = None, intGPIOChip = "/dev/gpiochip0", realtime = False, realtimeCPU = None, realtimePriority = 20, debug = False):
         """
         Initializer function
         """
@@ -43,8 +59,39 @@ class GT911:
         self.scalingFactor = int(scaling)
         self.__dp(f"Coordinate scaling factor: {self.scalingFactor}")
 
+        # Interrupt line (optional - without it, we fall back to plain polling)
+        self.intGPIO = intGPIO
+        self.intGPIOChip = intGPIOChip
+        self.__dp(f"Interrupt GPIO: {self.intGPIOChip} line {self.intGPIO}" if self.intGPIO is not None else "Interrupt GPIO: none (polling mode)")
+
+        # Real-time scheduling / CPU pinning for the service loop
+        self.realtime = realtime
+        self.realtimeCPU = realtimeCPU
+        self.realtimePriority = int(realtimePriority)
+        self.__dp(f"Real-time mode: {self.realtime} (CPU = {self.realtimeCPU}) (priority = {self.realtimePriority})")
+
         # Open I2C bus
         self.bus = SMBus(self.busID)
+        self.__checkBusSpeed()
+
+        # Register addresses and I2C messages for the report read/clear, built once and reused for every report
+        self.__regStatus = bytes([0x81, 0x4E])
+        self.__reportWrite = i2c_msg.write(self.deviceAddress, self.__regStatus)
+        self.__reportBuffer = bytearray(self.REPORT_LENGTH)
+        self.__reportView = memoryview(self.__reportBuffer)
+        reportBufferPointer = ctypes.cast((ctypes.c_char * self.REPORT_LENGTH).from_buffer(self.__reportBuffer), ctypes.POINTER(ctypes.c_char))
+        self.__reportRead = i2c_msg(addr = self.deviceAddress, flags = I2C_M_RD, len = self.REPORT_LENGTH, buf = reportBufferPointer)
+        self.__statusClear = i2c_msg.write(self.deviceAddress, self.__regStatus + bytes([0]))
+
+        # ...as well as the I2C_RDWR ioctl payloads, so reading a report is just one ioctl() on the bus fd
+        self.__reportTransfer = i2c_rdwr_ioctl_data.create(self.__reportWrite, self.__reportRead)
+        self.__clearTransfer = i2c_rdwr_ioctl_data.create(self.__statusClear)
+        self.__clearAndReportTransfer = i2c_rdwr_ioctl_data.create(self.__statusClear, self.__reportWrite, self.__reportRead)
+
+        # When polling, the status clear for a consumed report is sent along with the next report read.
+        # With the INT line, the GT911 won't raise the next interrupt until it's cleared, so that happens right away
+        self.__deferStatusClear = self.intGPIO is None
+        self.__statusClearPending = False
 
         # Try to talk to the screen and get initial data
         self.touchBoundary = self.__queryTouchBoundary()
@@ -52,48 +99,30 @@ class GT911:
         self.__dp(f"Screen touch boundary: {self.touchBoundary}")
         self.__dp(f"Coordinate resolution: {self.coordinateResolution}")
 
-        # Hardcoded register IDs for touch points
-        self.__tpRegisterID = {
-            0 : {
-                "track" : [0x81, 0x4F],
-                "x" : [[0x81, 0x50], [0x81, 0x51]],
-                "y" : [[0x81, 0x52], [0x81, 0x53]],
-                "size" : [[0x81, 0x54], [0x81, 0x55]]
-            },
-            1 : {
-                "track" : [0x81, 0x57],
-                "x" : [[0x81, 0x58], [0x81, 0x59]],
-                "y" : [[0x81, 0x5A], [0x81, 0x5B]],
-                "size" : [[0x81, 0x5C], [0x81, 0x5D]]
-            },
-            2 : {
-                "track" : [0x81, 0x5F],
-                "x" : [[0x81, 0x60], [0x81, 0x61]],
-                "y" : [[0x81, 0x62], [0x81, 0x63]],
-                "size" : [[0x81, 0x64], [0x81, 0x65]]
-            },
-            3 : {
-                "track" : [0x81, 0x67],
-                "x" : [[0x81, 0x68], [0x81, 0x69]],
-                "y" : [[0x81, 0x6A], [0x81, 0x6B]],
-                "size" : [[0x81, 0x6C], [0x81, 0x6D]]
-            },
-            4 : {
-                "track" : [0x81, 0x6F],
-                "x" : [[0x81, 0x70], [0x81, 0x71]],
-                "y" : [[0x81, 0x72], [0x81, 0x73]],
-                "size" : [[0x81, 0x74], [0x81, 0x75]]
-            }
-        }
+        # Scaling and axis flips folded into one factor + offset per axis (x' = x * scale + bias),
+        # so the report handler doesn't need to branch on them for every point
+        self.__xScale = -self.scalingFactor if self.flipX else self.scalingFactor
+        self.__xBias = self.coordinateResolution[0] if self.flipX else 0
+        self.__yScale = -self.scalingFactor if self.flipY else self.scalingFactor
+        self.__yBias = self.coordinateResolution[1] if self.flipY else 0
 
-        # Touch track information
-        self.__touchInfo = {}
-        self.__previousTouchInfo = {}
+        # ...which in the default configuration (no scaling, no flips) don't do anything at all
+        self.__transformCoordinates = (self.__xScale, self.__xBias, self.__yScale, self.__yBias) != (1, 0, 1, 0)
+
+        # Touch track information, one entry per track ID (current and previous report),
+        # with the set of active tracks kept as a bitmask
+        self.__curX, self.__prevX = [0] * self.MAX_TRACKS, [0] * self.MAX_TRACKS
+        self.__curY, self.__prevY = [0] * self.MAX_TRACKS, [0] * self.MAX_TRACKS
+        self.__curSize, self.__prevSize = [0] * self.MAX_TRACKS, [0] * self.MAX_TRACKS
+        self.__curActive, self.__prevActive = 0, 0
+
+        # Pending input events, flushed to uinput in one write per report
+        self.__events = bytearray()
 
         # Virtual touchscreen capabilities
         self.caps = {
             e.EV_ABS: [
-                (e.ABS_MT_SLOT, AbsInfo(value=0, min=0, max=9, fuzz=0, flat=0, resolution=0)),
+                (e.ABS_MT_SLOT, AbsInfo(value=0, min=0, max=self.MAX_TRACKS - 1, fuzz=0, flat=0, resolution=0)),
                 (e.ABS_MT_TOUCH_MAJOR, AbsInfo(0, 0, 255, 0, 0, 0)),
                 (e.ABS_MT_POSITION_X, AbsInfo(0, 0, int(self.coordinateResolution[0]), 0, 0, 0)),
                 (e.ABS_MT_POSITION_Y, AbsInfo(0, 0, int(self.coordinateResolution[1]), 0, 0, 0)),
@@ -112,6 +141,13 @@ class GT911:
         # The virtual touchscreen device itself
         self.ui = UInput(self.caps, name="enp6s0 GT911 Userspace Touchscreen", version=0x3, input_props = self.props)
 
+        # Request the interrupt line, if we have one
+        self.intRequest = self.__requestInterruptLine() if self.intGPIO is not None else None
+
+        # Get out of the way of everything else running on the box, if asked to
+        if self.realtime:
+            self.__setupRealtime()
+
         # Go into read loop
         self.__readLoop()
 
@@ -128,90 +164,65 @@ class GT911:
         """
         self.bus.close()
         self.ui.close()
+        if self.intRequest is not None:
+            self.intRequest.release()
 
-    def __writeI2C(self, register, data):
+    def __checkBusSpeed(self):
         """
-        A function that writes data to a register of the i2c device...
-
-        register: The register address to write to, specified as a list (high to low)
-        data: Data to be written. This can be a single integer or a list of integers
+        Looks up the I2C bus clock from the device tree (if there is one) and complains if it's
+        below 400KHz - the GT911 handles fast mode fine, and report reads are bound by bus time
         """
-
-        # Sanity checks
-        assert type(register) == list, "Register ID must be specified as list!"
-        assert isinstance(data, (int, list)), "Data must be an integer or a list of integers!"
-        if isinstance(data, int):
-            data = [data]  # Convert single integer to a list
-
-        # Combine the register and data into a single message
-        message = register + data
-
-        # Write the message to the device
-        write = i2c_msg.write(self.deviceAddress, message)
-        self.bus.i2c_rdwr(write)
-
-    def __readI2C(self, register, numBytes = 1):
+        adapter = os.path.basename(os.path.realpath(self.busID))
+        try:
+            with open(f"/sys/bus/i2c/devices/{adapter}/of_node/clock-frequency", "rb") as f:
+                clockFrequency = int.from_bytes(f.read(4), "big")
+        except OSError:
+            self.__dp(f"Couldn't determine I2C bus clock for {adapter}")
+            return
+
+        self.__dp(f"I2C bus clock: {clockFrequency} Hz")
+        if clockFrequency < 400000:
+            print(f"[Warning] I2C bus {adapter} runs at {clockFrequency // 1000}KHz, the GT911 supports 400KHz - "
+                  "set clock-frequency = <400000>; on the bus in the device tree (see readme) for faster reads")
+
+    def __readBlock(self, register, numBytes):
         """
-        A function that reads numBytes from register of the i2c device
+        Reads a contiguous block of numBytes starting at register, in one combined
+        write-then-read I2C transaction (the GT911 auto-increments its register pointer)
         """
 
         # Sanity checks
-        assert type(register) == list, "Register ID must be specified as list! (high to low)"
-        assert type(numBytes) == int, "Number of bytes to read must be integer!"
-        assert len(register) >= 1, "Must specify register location!"
+        assert type(register) == bytes, "Register ID must be specified as bytes! (high to low)"
         assert int(numBytes) >= 1, "Must read at least 1 byte!"
 
-        # First, we write the register address to read from -> device
+        # Register address write + data read, submitted together (repeated START, no STOP in between)
         write = i2c_msg.write(self.deviceAddress, register)
-        self.bus.i2c_rdwr(write)
-
-        # Then, we read the data block
         read = i2c_msg.read(self.deviceAddress, numBytes)
-        self.bus.i2c_rdwr(read)
+        self.bus.i2c_rdwr(write, read)
 
-        # Now we have the data...
-        if(numBytes > 1):
-            return list(read)
-        else:
-            return list(read)[0] # hacky but easy way of doing it...
+        return bytes(read)
 
-    def __readI2CMultiByteValue(self, registers, combine = True):
+    def __readReportBlock(self):
         """
-        Wrapper function to read multiple one-byte values from different registers
-        (this also handles combining stuff, automagically)
-
-        registers should be specified as a list of lists, with registers starting
-        from the highest (first) byte to read. Returned data will be shifted/combined
-        into one number if the argument "combine" is set to true, otherwise this
-        returns a list of all items individually.
+        Hot-path version of __readBlock for the report registers, using the pre-built ioctl payloads
+        (and prefixed with the pending status clear, if any). Data ends up in self.__reportBuffer,
+        a view of which is returned
         """
-        # Sanity check
-        if not all(isinstance(reg, list) for reg in registers):
-            raise ValueError("Each register must be specified as a list")
-
-        # Read values, one byte from each register
-        readValues = []
-        for register in registers:
-            value = self.__readI2C(register, numBytes = 1)
-            readValues.append(value)
-
-        # Combine the values into a single number (LOW bytes first)
-        if combine:
-            combinedValue = 0
-            for i, value in enumerate(readValues):
-                combinedValue |= value << (8 * i)
-            return combinedValue
-
-        # Otherwise just return the list, as-is
+        if self.__statusClearPending:
+            fcntl.ioctl(self.bus.fd, I2C_RDWR, self.__clearAndReportTransfer)
+            self.__statusClearPending = False
         else:
-            return readValues
+            fcntl.ioctl(self.bus.fd, I2C_RDWR, self.__reportTransfer)
+        return self.__reportView
 
     def __queryTouchBoundary(self):
         """
         Wrapper function to query the GT911 device and get X and Y output max values
         """
-        xMax = self.__readI2CMultiByteValue([[0x80, 0x48], [0x80, 0x49]]) * self.scalingFactor
-        yMax = self.__readI2CMultiByteValue([[0x80, 0x4A], [0x80, 0x4B]]) * self.scalingFactor
+        # X max (low, high), Y max (low, high)
+        buf = self.__readBlock(bytes([0x80, 0x48]), 4)
+        xMax = (buf[0] | buf[1] << 8) * self.scalingFactor
+        yMax = (buf[2] | buf[3] << 8) * self.scalingFactor
 
         if(self.swapXY):
             xMax, yMax = yMax, xMax
@@ -222,92 +233,97 @@ class GT911:
         """
         Wrapper function to query for coordinate resolution
         """
-        xRes = self.__readI2CMultiByteValue([[0x81, 0x46], [0x81, 0x47]]) * self.scalingFactor
-        yRes = self.__readI2CMultiByteValue([[0x81, 0x48], [0x81, 0x49]]) * self.scalingFactor
+        # X resolution (low, high), Y resolution (low, high)
+        buf = self.__readBlock(bytes([0x81, 0x46]), 4)
+        xRes = (buf[0] | buf[1] << 8) * self.scalingFactor
+        yRes = (buf[2] | buf[3] << 8) * self.scalingFactor
 
         if(self.swapXY):
             xRes, yRes = yRes, xRes
 
         return (xRes, yRes)
 
-    def __queryPoint(self, pointID):
+    @staticmethod
+    def __tracksIn(mask):
         """
-        Get data for a specific touch point
+        Yields the track IDs set in a track bitmask
         """
-        assert 0 <= pointID <= 4, "Invalid point ID"
-
-        xCoordinate = self.__readI2CMultiByteValue(self.__tpRegisterID[pointID]["x"]) * self.scalingFactor
-        yCoordinate = self.__readI2CMultiByteValue(self.__tpRegisterID[pointID]["y"]) * self.scalingFactor
-
-        # Flip axis inputs?
-        if(self.flipX):
-            xCoordinate = self.coordinateResolution[0] - xCoordinate
-        if(self.flipY):
-            yCoordinate = self.coordinateResolution[1] - yCoordinate
-        if(self.swapXY):
-            xCoordinate, yCoordinate = yCoordinate, xCoordinate
-
-        size = self.__readI2CMultiByteValue(self.__tpRegisterID[pointID]["size"])
-        track = self.__readI2C(self.__tpRegisterID[pointID]["track"])
-
-        return xCoordinate, yCoordinate, size, track
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
 
     def __eventCallback(self):
         """
         This gets called when there is a change in touchinfo, where we figure out what's going on
         and fire the correct events
         """
+        curActive, prevActive = self.__curActive, self.__prevActive
 
         # Detect new tracks
-        newTracks = set(self.__touchInfo.keys()) - set(self.__previousTouchInfo.keys())
-        for trackID in newTracks:
-            self.__newTrack(trackID, self.__touchInfo[trackID])
-        if len(newTracks) > 0:
-            self.ui.syn()
-
-        # Detect updated tracks
-        commonTracks = set(self.__touchInfo.keys()).intersection(self.__previousTouchInfo.keys())
-        for trackID in commonTracks:
-            #if self.__touchInfo[trackID] != self.__previousTouchInfo[trackID]:
-            self.__updateTrack(trackID, self.__touchInfo[trackID])
-        if len(commonTracks) > 0:
-            self.ui.syn()
+        newTracks = curActive & ~prevActive
+        for trackID in self.__tracksIn(newTracks):
+            self.__newTrack(trackID)
+
+        # Detect updated tracks (fingers held still get reported every scan - no need to pass those on)
+        commonTracks = curActive & prevActive
+        curX, curY, curSize = self.__curX, self.__curY, self.__curSize
+        prevX, prevY, prevSize = self.__prevX, self.__prevY, self.__prevSize
+        for trackID in self.__tracksIn(commonTracks):
+            if curX[trackID] != prevX[trackID] or curY[trackID] != prevY[trackID] or curSize[trackID] != prevSize[trackID]:
+                self.__updateTrack(trackID)
 
         # Detect ended tracks
-        endedTracks = set(self.__previousTouchInfo.keys()) - set(self.__touchInfo.keys())
-        for trackID in endedTracks:
+        endedTracks = prevActive & ~curActive
+        for trackID in self.__tracksIn(endedTracks):
             self.__endTrack(trackID)
-        if len(endedTracks) > 0:
-            self.ui.syn()
 
-        # Update previous state
-        self.__previousTouchInfo = self.__touchInfo.copy()
+        # Send everything off as a single frame
+        if self.__events:
+            self.__writeEvent(e.EV_SYN, e.SYN_REPORT, 0)
+            os.write(self.ui.fd, self.__events)
+            self.__events.clear()
+
+        # Update previous state (swap buffers, current ones get overwritten by the next report)
+        self.__prevX, self.__curX = self.__curX, self.__prevX
+        self.__prevY, self.__curY = self.__curY, self.__prevY
+        self.__prevSize, self.__curSize = self.__curSize, self.__prevSize
+        self.__prevActive = curActive
 
-    def __newTrack(self, trackID, info):
+    def __writeEvent(self, eventType, code, value):
         """
-        Event handler for new tracks
+        Queues an input event, to be written out with the rest of the frame
         """
-        self.__dp(f"New track: {trackID} {info}")
-
-        self.ui.write(e.EV_ABS, e.ABS_MT_SLOT, trackID)
-        self.ui.write(e.EV_ABS, e.ABS_MT_TRACKING_ID, trackID)
-        self.ui.write(e.EV_ABS, e.ABS_MT_POSITION_X, info["x"])
-        self.ui.write(e.EV_ABS, e.ABS_MT_POSITION_Y, info["y"])
-        self.ui.write(e.EV_ABS, e.ABS_MT_TOUCH_MAJOR, info["size"])
-        #self.ui.syn()
+        self.__events += self.INPUT_EVENT.pack(0, 0, eventType, code, value)
 
-
-    def __updateTrack(self, trackID, info):
+    def __newTrack(self, trackID):
+        """
+        Event handler for new tracks
+        """
+        x, y, size = self.__curX[trackID], self.__curY[trackID], self.__curSize[trackID]
+        self.__dp(f"New track: {trackID} (x = {x}, y = {y}, size = {size})")
+
+        self.__events += self.NEW_TRACK_EVENTS.pack(
+            0, 0, e.EV_ABS, e.ABS_MT_SLOT, trackID,
+            0, 0, e.EV_ABS, e.ABS_MT_TRACKING_ID, trackID,
+            0, 0, e.EV_ABS, e.ABS_MT_POSITION_X, x,
+            0, 0, e.EV_ABS, e.ABS_MT_POSITION_Y, y,
+            0, 0, e.EV_ABS, e.ABS_MT_TOUCH_MAJOR, size
+        )
+
+    def __updateTrack(self, trackID):
         """
         Event handler for updated tracks
         """
-        self.__dp(f"Updated track: {trackID} {info}")
+        x, y, size = self.__curX[trackID], self.__curY[trackID], self.__curSize[trackID]
+        self.__dp(f"Updated track: {trackID} (x = {x}, y = {y}, size = {size})")
 
-        self.ui.write(e.EV_ABS, e.ABS_MT_SLOT, trackID)
-        self.ui.write(e.EV_ABS, e.ABS_MT_POSITION_X, info["x"])
-        self.ui.write(e.EV_ABS, e.ABS_MT_POSITION_Y, info["y"])
-        self.ui.write(e.EV_ABS, e.ABS_MT_TOUCH_MAJOR, info["size"])
-        #self.ui.syn()
+        self.__events += self.UPDATE_TRACK_EVENTS.pack(
+            0, 0, e.EV_ABS, e.ABS_MT_SLOT, trackID,
+            0, 0, e.EV_ABS, e.ABS_MT_POSITION_X, x,
+            0, 0, e.EV_ABS, e.ABS_MT_POSITION_Y, y,
+            0, 0, e.EV_ABS, e.ABS_MT_TOUCH_MAJOR, size
+        )
 
     def __endTrack(self, trackID):
         """
@@ -315,62 +331,194 @@ class GT911:
         """
         self.__dp(f"Track ended: {trackID}")
 
-        self.ui.write(e.EV_ABS, e.ABS_MT_SLOT, trackID)
-        self.ui.write(e.EV_ABS, e.ABS_MT_TRACKING_ID, -1)
-        #self.ui.syn()
+        self.__events += self.END_TRACK_EVENTS.pack(
+            0, 0, e.EV_ABS, e.ABS_MT_SLOT, trackID,
+            0, 0, e.EV_ABS, e.ABS_MT_TRACKING_ID, -1
+        )
+
+    def __setupRealtime(self):
+        """
+        Pins the process to a CPU, switches it to SCHED_FIFO and locks its memory, so that
+        scheduler wakeups and page faults don't add jitter to touch reports. Needs root (or CAP_SYS_NICE
+        and CAP_IPC_LOCK) - failures are reported but not fatal
+        """
+        # Pin to the requested CPU, as long as it's one we're actually allowed to run on
+        if self.realtimeCPU is not None:
+            allowedCPUs = os.sched_getaffinity(0)
+            if int(self.realtimeCPU) not in allowedCPUs:
+                print(f"[Warning] Can't pin to CPU {self.realtimeCPU}, must be one of {sorted(allowedCPUs)}")
+            else:
+                try:
+                    os.sched_setaffinity(0, {int(self.realtimeCPU)})
+                except OSError as err:
+                    print(f"[Warning] Couldn't pin to CPU {self.realtimeCPU}: {err}")
+
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.realtimePriority))
+        except OSError as err:
+            print(f"[Warning] Couldn't switch to SCHED_FIFO (priority {self.realtimePriority}): {err}")
+
+        # mlockall(MCL_CURRENT | MCL_FUTURE) - there's no Python wrapper for it, so go through libc
+        libc = ctypes.CDLL(None, use_errno = True)
+        if libc.mlockall(1 | 2) != 0:
+            print(f"[Warning] Couldn't lock memory: {os.strerror(ctypes.get_errno())}")
+
+    def __requestInterruptLine(self):
+        """
+        Requests the GT911 INT pin as a rising-edge event line via libgpiod,
+        so the read loop can sleep until the controller has a new report for us
+        """
+        import gpiod
+        from gpiod.line import Edge
+
+        return gpiod.request_lines(
+            self.intGPIOChip,
+            consumer = "gt911-touchscreen",
+            config = {int(self.intGPIO): gpiod.LineSettings(edge_detection = Edge.RISING)}
+        )
+
+    def __readReport(self):
+        """
+        Reads one report from the device and fires the corresponding events
+        """
+
+        # First, we read the status byte and all five point slots in one go (0x814E - 0x8176)
+        # and parse the status byte...
+        buf = self.__readReportBlock()
+        statusByte = buf[0]
+
+        bufferStatus = bool(statusByte & 0b10000000)    # Buffer status - do we have something for the host to read?
+        largeDetect = bool(statusByte & 0b01000000)     # Large detect - do we have a large-area touch (possibly palm) on the panel?
+        proximityValid = bool(statusByte & 0b00100000)  # Proximity valid - IDK this is not documented
+        haveKey = bool(statusByte & 0b00010000)         # Touch key (True if "active", False if "released")
+        touchPoints = statusByte & 0b00001111           # Number of touch points active in this report
+
+        if(bufferStatus):
+
+            # There is something for us to read! For now, this simple "driver" ignores touch keys completely (don't even know what that is)
+            if(touchPoints >= 1):
+
+                # Aha - we have touch points! Let's figure out where they are, shall we?
+                # (this runs for every point of every report, so everything it touches is pulled into locals first)
+                transform = self.__transformCoordinates
+                xScale, xBias, yScale, yBias = self.__xScale, self.__xBias, self.__yScale, self.__yBias
+                maxTracks = self.MAX_TRACKS
+
+                # X/Y swap is done by simply storing X as Y, and Y as X
+                if(self.swapXY):
+                    curX, curY = self.__curY, self.__curX
+                else:
+                    curX, curY = self.__curX, self.__curY
+                curSize = self.__curSize
+
+                # The point slots all share one layout, so let struct decode them all in one go
+                points = self.TOUCH_POINT.iter_unpack(buf[1 : 1 + min(touchPoints, 5) * 8])
+
+                active = 0
+                for track, x, y, size in points:
+                    if track >= maxTracks:
+                        self.__dp(f"Ignoring out-of-range track ID {track}")
+                        continue
+                    if(transform):
+                        x = x * xScale + xBias
+                        y = y * yScale + yBias
+                    curX[track] = x
+                    curY[track] = y
+                    curSize[track] = size
+                    active |= 1 << track
+
+                # Tracks missing from this report are no longer active
+                self.__curActive = active
+
+                # Call event handler
+                self.__eventCallback()
+
+            else:
+                # Zero touch points (last finger lifted?)
+                self.__curActive = 0
+                self.__eventCallback()
+
+            # Clear buffer - we've read already
+            if self.__deferStatusClear:
+                self.__statusClearPending = True
+            else:
+                fcntl.ioctl(self.bus.fd, I2C_RDWR, self.__clearTransfer)
 
     def __readLoop(self):
         """
-        Polling loop to read data from device
+        Service loop to read data from device, either on interrupt or by polling.
+        Runs until SIGINT/SIGTERM, then cleans up. If reading from the device fails, this cleans up
+        and re-raises, so the process exits with an error (and systemd can restart it)
         """
+        try:
+            asyncio.run(self.__serve())
+        finally:
+            self.cleanup()
 
-        # Yes, this is a blocking and never-ending service loop
-        while(True):
+    async def __serve(self):
+        """
+        Asynchronous part of the service loop - sets up the report reader and waits for either
+        a stop signal or the reader failing
+        """
+        loop = asyncio.get_running_loop()
 
-            # First, we read the status byte and parse it...
-            statusByte = self.__readI2C([0x81, 0x4E])
+        # CTRL+C / SIGTERM -> stop the loop so we can clean up
+        stopping = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stopping.set)
 
-            bufferStatus = bool(statusByte & 0b10000000)    # Buffer status - do we have something for the host to read?
-            largeDetect = bool(statusByte & 0b01000000)     # Large detect - do we have a large-area touch (possibly palm) on the panel?
-            proximityValid = bool(statusByte & 0b00100000)  # Proximity valid - IDK this is not documented
-            haveKey = bool(statusByte & 0b00010000)         # Touch key (True if "active", False if "released")
-            touchPoints = statusByte & 0b00001111           # Number of touch points active in this report
+        # No interrupt line - poll in the background (the task only ever finishes if reading fails)
+        if self.intRequest is None:
+            reader = asyncio.create_task(self.__pollLoop())
 
-            if(bufferStatus):
+        # Interrupt line available - read whenever the GT911 signals a new report
+        # (the interrupt handler fails this future if reading fails)
+        else:
+            reader = loop.create_future()
+            loop.add_reader(self.intRequest.fd, self.__onInterrupt, reader)
 
-                # There is something for us to read! For now, this simple "driver" ignores touch keys completely (don't even know what that is)
-                if(touchPoints >= 1):
+        stopper = asyncio.create_task(stopping.wait())
+        try:
+            # Catch anything that was already pending before the first edge
+            if self.intRequest is not None:
+                self.__readReport()
 
-                    # Aha - we have touch points! Let's figure out where they are, shall we?
-                    tracksThisRound = []
-                    for i in range(touchPoints):
-                        x, y, size, track = self.__queryPoint(i)
-                        self.__touchInfo[track] = {
-                            "x" : x,
-                            "y" : y,
-                            "size" : size,
-                            "track": track
-                        }
-                        tracksThisRound.append(track)
+            done, pending = await asyncio.wait({reader, stopper}, return_when = asyncio.FIRST_COMPLETED)
 
-                    # Remove missing tracks from info
-                    toDel = [k for k in self.__touchInfo.keys() if k not in tracksThisRound]
-                    for k in toDel:
-                        del self.__touchInfo[k]
+            # Reading failed - pass the error on
+            if reader in done:
+                reader.result()
 
-                    # Call event handler
-                    self.__eventCallback()
+        finally:
+            if self.intRequest is not None:
+                loop.remove_reader(self.intRequest.fd)
+            reader.cancel()
+            stopper.cancel()
 
-                else:
-                    # Zero touch points (last finger lifted?)
-                    self.__touchInfo = {}
-                    self.__eventCallback()
+        self.__dp("Stopping")
 
-                # Clear buffer - we've read already
-                self.__writeI2C([0x81, 0x4E], 0)
+    async def __pollLoop(self):
+        """
+        Polling loop for when there's no interrupt line, throttled a bit... 1KHz should be enough
+        """
+        readReport, sleep = self.__readReport, asyncio.sleep
+        while(True):
+            readReport()
+            await sleep(0.001)
 
-            # Throttle the loop a bit... 1KHz should be enough
-            time.sleep(0.001)
+    def __onInterrupt(self, reader):
+        """
+        Handler for the INT line becoming readable - drains the edge events and reads the report.
+        Errors are handed to the service loop through the reader future, instead of asyncio just
+        logging them and calling us again on the next edge
+        """
+        try:
+            self.intRequest.read_edge_events()
+            self.__readReport()
+        except Exception as err:
+            asyncio.get_running_loop().remove_reader(self.intRequest.fd)
+            if not reader.done():
+                reader.set_exception(err)
 
 
 if __name__ == "__main__":
@@ -383,10 +531,17 @@ if __name__ == "__main__":
     parser.add_argument("--flip-y", action = "store_true", help = "Flip Y-axis")
     parser.add_argument("--swap-xy", action = "store_true", help = "Send X as Y, and Y as X")
 
+    parser.add_argument("--int-gpio", type = int, default = None, help = "GPIO line offset of the GT911 INT pin (uses interrupts instead of polling, requires libgpiod)")
+    parser.add_argument("--int-gpio-chip", default = "/dev/gpiochip0", help = "GPIO chip the INT pin is on")
+
+    parser.add_argument("--rt", action = "store_true", help = "Run with real-time (SCHED_FIFO) scheduling and locked memory")
+    parser.add_argument("--rt-cpu", type = int, default = None, help = "CPU to pin the driver to in real-time mode")
+    parser.add_argument("--rt-priority", type = int, default = 20, help = "SCHED_FIFO priority to use in real-time mode")
+
     parser.add_argument("--debug", action = "store_true", help = "Debug mode")
 
     # Parse arguments
     args = parser.parse_args()
 
     # Get things going for real
-    gt911 = GT911(scaling = args.scaling, flipX = args.flip_x, flipY = args.flip_y, swapXY = args.swap_xy, debug = args.debug)
+    gt911 = GT911(scaling = args.scaling, flipX = args.flip_x, flipY = args.flip_y, swapXY = args.swap_xy, intGPIO = args.int_gpio, intGPIOChip = args.int_gpio_chip, realtime = args.rt, realtimeCPU = args.rt_cpu, realtimePriority = args.rt_priority, debug = args.debug)